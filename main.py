@@ -1,26 +1,34 @@
 import asyncio
+import functools
 import logging
 import os
+import secrets
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+from typing import Any, Optional
 
 import certifi
 import nltk
-from fastapi import FastAPI, HTTPException, Request
+import orjson
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
-from utils.async_threading import run_in_thread
-from wos.common import extract_prompt_fields, get_payload_data, store_metrics
-from wos.custom_evaluator import run_evaluator
+from fastapi.responses import ORJSONResponse
+
+import logging_config  # noqa: F401
+from wos.common import (
+    close,
+    extract_prompt_fields,
+    get_last_run_date,
+    get_payload_data,
+    invalidate_prompt_fields,
+    store_metrics,
+)
+from wos.custom_evaluator import run_evaluator, warmup
 
 # ---------------------------------------------------------------------------
 # Logger setup
 # ---------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
 # ---------------------------------------------------------------------------
 # Environment configuration
@@ -28,23 +36,58 @@ logging.basicConfig(
 os.environ["REQUESTS_CA_BUNDLE"] = certifi.where()
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
 
+# Admin endpoints are disabled unless a token is configured.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# The cmudict corpus is downloaded at image build time (see Dockerfile).
+nltk.data.path.insert(0, "./nltk_data")
+
 try:
-    nltk.download("cmudict", download_dir="./nltk_data")
-    nltk.data.path.append("./nltk_data")
+    nltk.data.find("corpora/cmudict")
     logger.info("NLTK data initialized successfully.")
-except Exception:
-    logger.exception("Failed to initialize NLTK data.")
+except LookupError:
+    logger.exception("NLTK 'cmudict' corpus not found in ./nltk_data.")
     raise
 
+
 # ---------------------------------------------------------------------------
-# Thread pool (single worker to protect shared resources)
+# Thread pools
 # ---------------------------------------------------------------------------
-executor = ThreadPoolExecutor(max_workers=1)
+def _positive_int_env(name, default) -> int:
+    value = int(os.getenv(name, default))
+
+    if value < 1:
+        raise RuntimeError(f"Environment variable {name} must be at least 1")
+
+    return value
+
+
+# CPUs this process may run on (respects CPU affinity, unlike os.cpu_count()).
+AVAILABLE_CPUS = (
+    len(os.sched_getaffinity(0))
+    if hasattr(os, "sched_getaffinity")
+    else os.cpu_count() or 1
+)
+
+# Every worker process loads its own model set, so default to a single worker.
+WEB_CONCURRENCY = _positive_int_env("WEB_CONCURRENCY", 1)
+
+# I/O pool backs asyncio.to_thread for the blocking OpenScale calls.
+THREAD_POOL_SIZE = _positive_int_env("THREAD_POOL_SIZE", 32)
+
+io_executor = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="io")
+
+# CPU pool runs the metric evaluators; cores are split across worker processes.
+EVAL_THREADS = _positive_int_env(
+    "EVAL_THREADS", max(1, AVAILABLE_CPUS // WEB_CONCURRENCY)
+)
+
+cpu_executor = ThreadPoolExecutor(max_workers=EVAL_THREADS, thread_name_prefix="eval")
 
 # ---------------------------------------------------------------------------
 # FastAPI app
 # ---------------------------------------------------------------------------
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add FastAPI CORS middleware
 app.add_middleware(
@@ -55,6 +98,40 @@ app.add_middleware(
 )
 
 
+# ---------------------------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------------------------
+@app.on_event("startup")
+async def startup() -> None:
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(io_executor)
+
+    # Metric models are per eval thread, so warm every thread in the pool.
+    barrier = threading.Barrier(EVAL_THREADS, timeout=300)
+    results = await asyncio.gather(
+        *[
+            loop.run_in_executor(cpu_executor, warmup, barrier)
+            for _ in range(EVAL_THREADS)
+        ],
+        return_exceptions=True,
+    )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error(
+                "Metric warm-up failed; models will load on first request.",
+                exc_info=result,
+            )
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    cpu_executor.shutdown(wait=False, cancel_futures=True)
+    io_executor.shutdown(wait=False, cancel_futures=True)
+    close()
+    logger.info("OpenScale clients released.")
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -63,12 +140,28 @@ def index() -> dict[str, str]:
     return {"status": "FastAPI is running!"}
 
 
+@app.post("/admin/invalidate")
+def invalidate(
+    x_admin_token: Optional[str] = Header(default=None),
+) -> dict[str, str]:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token.encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+    invalidate_prompt_fields()
+    return {"status": "Subscription cache cleared."}
+
+
 @app.post("/compute/custom_metric")
 async def compute_custom_metric(request: Request):
 
     try:
-        request_body: dict[str, Any] = await request.json()
-    except Exception:
+        request_body: dict[str, Any] = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
         raise HTTPException(
             status_code=400,
             detail="Invalid JSON payload.",
@@ -95,10 +188,13 @@ async def compute_custom_metric(request: Request):
     )
 
     try:
-        prompt_properties = extract_prompt_fields(subscription_id)
-        payload_data = get_payload_data(
+        prompt_properties, start_date = await asyncio.gather(
+            asyncio.to_thread(extract_prompt_fields, subscription_id),
+            asyncio.to_thread(get_last_run_date, monitor_inst_id),
+        )
+        payload_data = await get_payload_data(
             payload_dataset_id,
-            monitor_inst_id,
+            start_date,
             prompt_properties,
         )
     except Exception as exc:
@@ -106,27 +202,38 @@ async def compute_custom_metric(request: Request):
         raise HTTPException(status_code=500, detail=str(exc))
 
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         custom_metrics = await loop.run_in_executor(
-            executor,
-            run_in_thread,
-            run_evaluator,
-            payload_data,
-            prompt_properties,
+            cpu_executor,
+            functools.partial(run_evaluator, payload_data, prompt_properties),
         )
     except Exception as exc:
         logger.exception("Custom evaluator execution failed.")
         raise HTTPException(status_code=500, detail=str(exc))
 
     try:
-        store_metrics(monitor_inst_id, run_id, custom_metrics)
-    except Exception as ex:
+        await asyncio.to_thread(store_metrics, monitor_inst_id, run_id, custom_metrics)
+    except Exception as exc:
         logger.exception("Failed to store metrics")
-        return JSONResponse(
+        return ORJSONResponse(
             content={"predictions": [], "errors": [str(exc)]},
             status_code=500,
         )
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={"predictions": [{"values": ["success"]}]}, status_code=200
     )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Each worker process holds its own cached OpenScale clients and evaluators.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=WEB_CONCURRENCY,
+        loop="uvloop",
+        http="httptools",
+    )
@@ -1,11 +1,19 @@
+import asyncio
 import logging
 import os
-from typing import Any, Optional
+import threading
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
+import orjson
 import pandas as pd
+import pyarrow as pa
 from beekeeper.monitors.watsonx import WatsonxCustomMetricsManager
+from cachetools import TTLCache, cached
 from ibm_watson_openscale import APIClient
 from ibm_watson_openscale.utils import IAMAuthenticator
+from requests import Session
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -15,28 +23,94 @@ API_KEY = os.environ.get("OPENSCALE_API_KEY")
 if not API_KEY:
     raise RuntimeError("Environment variable OPENSCALE_API_KEY is not set")
 
+PAGE_SIZE = 500
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+
 # ---------------------------------------------------------------------------
 # Logger setup
 # ---------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
 
 
 # ---------------------------------------------------------------------------
 # OpenScale utilities
 # ---------------------------------------------------------------------------
+def _configure_session(service) -> None:
+    session = getattr(service, "http_client", None)
+
+    if not isinstance(session, Session) or not hasattr(service, "enable_retries"):
+        logger.warning(
+            "No SDK HTTP session found on %s; connection pooling not tuned.",
+            type(service).__name__,
+        )
+        return
+
+    # Let the SDK mount its own TLS adapter with retries, then enlarge that
+    # adapter's pool instead of replacing it.
+    service.enable_retries(max_retries=3)
+    session.get_adapter("https://").init_poolmanager(POOL_CONNECTIONS, POOL_MAXSIZE)
+
+
+_CLIENT: Optional[APIClient] = None
+_METRIC_MANAGER: Optional[WatsonxCustomMetricsManager] = None
+_CLIENT_LOCK = threading.Lock()
+
+
 def _get_client() -> APIClient:
-    authenticator = IAMAuthenticator(apikey=API_KEY)
-    return APIClient(authenticator=authenticator)
+    global _CLIENT
+
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                authenticator = IAMAuthenticator(apikey=API_KEY)
+                _CLIENT = APIClient(authenticator=authenticator)
+                _configure_session(_CLIENT)
+
+    return _CLIENT
+
+
+def _get_metric_manager() -> WatsonxCustomMetricsManager:
+    global _METRIC_MANAGER
+
+    if _METRIC_MANAGER is None:
+        with _CLIENT_LOCK:
+            if _METRIC_MANAGER is None:
+                # The manager does not expose its HTTP session, so it keeps
+                # the SDK defaults.
+                _METRIC_MANAGER = WatsonxCustomMetricsManager(api_key=API_KEY)
+
+    return _METRIC_MANAGER
+
+
+def close() -> None:
+    global _CLIENT, _METRIC_MANAGER
+
+    with _CLIENT_LOCK:
+        for client in (_CLIENT, _METRIC_MANAGER):
+            session = getattr(client, "http_client", None)
+
+            if isinstance(session, Session):
+                session.close()
+
+        _CLIENT = None
+        _METRIC_MANAGER = None
 
 
 # ---------------------------------------------------------------------------
 # Subscription utilities
 # ---------------------------------------------------------------------------
-def extract_prompt_fields(subscription_id) -> dict[str, Any]:
+_PROMPT_FIELDS_CACHE: TTLCache = TTLCache(maxsize=256, ttl=300)
+_PROMPT_FIELDS_LOCK = threading.Lock()
+
+
+def invalidate_prompt_fields() -> None:
+    with _PROMPT_FIELDS_LOCK:
+        _PROMPT_FIELDS_CACHE.clear()
+
+
+@cached(cache=_PROMPT_FIELDS_CACHE, lock=_PROMPT_FIELDS_LOCK)
+def extract_prompt_fields(subscription_id) -> Mapping[str, Any]:
     wos_client = _get_client()
 
     payload = wos_client.subscriptions.get(
@@ -55,31 +129,33 @@ def extract_prompt_fields(subscription_id) -> dict[str, Any]:
         )
         raise RuntimeError("Invalid subscription payload structure") from exc
 
-    # Always extract feature_fields
-    feature_fields = set(asset_props.get("feature_fields", []))
+    # Always extract feature_fields (deduplicated, source order preserved)
+    feature_fields = tuple(dict.fromkeys(asset_props.get("feature_fields", [])))
 
     # Only extract context_fields for RAG
     if problem_type == "retrieval_augmented_generation":
-        context_fields = set(asset_props.get("context_fields", []))
+        context_fields = tuple(dict.fromkeys(asset_props.get("context_fields", [])))
 
         # Remove duplicates
-        feature_fields = feature_fields - context_fields
-
-        # Combined fields
-        all_fields = feature_fields | context_fields
+        context_set = frozenset(context_fields)
+        feature_fields = tuple(f for f in feature_fields if f not in context_set)
+
+        return MappingProxyType(
+            {
+                "problem_type": problem_type,
+                "feature_fields": feature_fields,
+                "context_fields": context_fields,
+                "fields": feature_fields + context_fields,
+            }
+        )
 
-        return {
+    return MappingProxyType(
+        {
             "problem_type": problem_type,
-            "feature_fields": sorted(feature_fields),
-            "context_fields": sorted(context_fields),
-            "fields": sorted(all_fields),
+            "feature_fields": feature_fields,
+            "fields": feature_fields,
         }
-
-    return {
-        "problem_type": problem_type,
-        "feature_fields": sorted(feature_fields),
-        "fields": sorted(feature_fields),
-    }
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -112,37 +188,78 @@ def get_last_run_date(monitor_instance_id) -> Optional[str]:
 # ---------------------------------------------------------------------------
 # Payload utilities
 # ---------------------------------------------------------------------------
-def get_payload_data(
-    payload_dataset_id, monitor_instance_id, asset_properties
+def _to_text(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+
+    return str(value)
+
+
+async def get_payload_data(
+    payload_dataset_id, start_date, asset_properties
 ) -> pd.DataFrame:
     wos_client = _get_client()
 
-    start_date = get_last_run_date(monitor_instance_id)
     start_date = start_date or None
-    logger.info("Payload Dataset ID: %s", payload_dataset_id)
-    logger.info("Fetching payload data greater than or equal to: %s", start_date)
 
-    data = wos_client.data_sets.get_list_of_records(
-        data_set_id=payload_dataset_id, start=start_date, limit=500
-    ).result
+    # Pin the window end so records arriving mid-fetch cannot shift page offsets.
+    end_date = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    end_date = end_date.replace("+00:00", "Z")
+    logger.debug("Payload Dataset ID: %s", payload_dataset_id)
+    logger.debug("Fetching payload data greater than or equal to: %s", start_date)
+
+    columns = list(asset_properties["fields"])
+    columns.append("generated_text")
+
+    # Prompt variables and generated text are fed to text metrics, so every
+    # value is converted to a string; missing fields become nulls.
+    schema = pa.schema([(field, pa.string()) for field in columns])
+
+    # Convert each page to an Arrow batch as soon as it arrives, so the raw
+    # record dicts are released per page instead of held for the whole fetch.
+    def fetch_batch(offset, include_total_count=False) -> tuple[pa.RecordBatch, int]:
+        page = wos_client.data_sets.get_list_of_records(
+            data_set_id=payload_dataset_id,
+            start=start_date,
+            end=end_date,
+            limit=PAGE_SIZE,
+            offset=offset,
+            include_total_count=include_total_count,
+        ).result
+        records = page.get("records", [])
+        values = [record.get("entity", {}).get("values", {}) for record in records]
+
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array([_to_text(v.get(field)) for v in values], pa.string())
+                for field in columns
+            ],
+            schema=schema,
+        )
+        return batch, page.get("total_count", len(records))
 
-    rows = []
+    first_batch, total_count = await asyncio.to_thread(fetch_batch, 0, True)
 
-    for record in data.get("records", []):
-        values = record.get("entity", {}).get("values", {})
+    pages = await asyncio.gather(
+        *[
+            asyncio.to_thread(fetch_batch, offset)
+            for offset in range(PAGE_SIZE, total_count, PAGE_SIZE)
+        ]
+    )
 
-        row = {
-            field: values.get(field)
-            for field in asset_properties["fields"]
-            if field in values
-        }
+    batches = [first_batch]
+    batches.extend(batch for batch, _ in pages)
 
-        row["generated_text"] = values.get("generated_text")
-        rows.append(row)
+    df = pa.Table.from_batches(batches, schema=schema).to_pandas(
+        split_blocks=True, self_destruct=True
+    )
 
-    logger.info("Number of records in payload data: %d", len(rows))
+    logger.info("Number of records in payload data: %d", len(df))
 
-    return pd.DataFrame(rows)
+    return df
 
 
 # ---------------------------------------------------------------------------
@@ -150,7 +267,7 @@ def get_payload_data(
 # ---------------------------------------------------------------------------
 def store_metrics(monitor_instance_id, run_id, metrics) -> None:
     try:
-        metric_manager = WatsonxCustomMetricsManager(api_key=API_KEY)
+        metric_manager = _get_metric_manager()
 
         metric_manager.store_metric_data(
             monitor_instance_id=monitor_instance_id,
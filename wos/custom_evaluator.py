@@ -1,7 +1,12 @@
+import asyncio
 import logging
 import os
+import threading
 from collections import defaultdict
+from typing import Optional
 
+import pandas as pd
+from cachetools import LRUCache
 from ibm_watsonx_gov.clients.api_client import APIClient as GovAPIClient
 from ibm_watsonx_gov.config import Credentials, GenAIConfiguration
 from ibm_watsonx_gov.evaluators import MetricsEvaluator
@@ -25,12 +30,72 @@ if not API_KEY:
 # Logger setup
 # ---------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+# Metric instances hold their loaded models and are not known to be
+# thread-safe, so each eval thread builds its own set on first use.
+_METRIC_CLASSES = (
+    AnswerRelevanceMetric,
+    TextReadingEaseMetric,
+    SocialBiasMetric,
+    JailbreakMetric,
+    TextGradeLevelMetric,
 )
 
 
+# ---------------------------------------------------------------------------
+# Evaluator utilities
+# ---------------------------------------------------------------------------
+# MetricsEvaluator is not documented as thread-safe, so each eval thread keeps
+# its own client and evaluators instead of sharing them across the pool.
+_LOCAL = threading.local()
+
+
+def _build_evaluator(feature_fields, context_fields) -> MetricsEvaluator:
+    if not hasattr(_LOCAL, "gov_client"):
+        _LOCAL.gov_client = GovAPIClient(credentials=Credentials(api_key=API_KEY))
+
+    config = GenAIConfiguration(
+        input_fields=list(feature_fields),
+        context_fields=list(context_fields),
+        output_fields=["generated_text"],
+        reference_fields=[],
+    )
+    return MetricsEvaluator(api_client=_LOCAL.gov_client, configuration=config)
+
+
+def _get_evaluator(asset_properties) -> MetricsEvaluator:
+    problem_type = asset_properties.get("problem_type")
+    feature_fields = tuple(asset_properties.get("feature_fields", ()))
+    context_fields = (
+        tuple(asset_properties.get("context_fields", ()))
+        if problem_type == "retrieval_augmented_generation"
+        else ()
+    )
+    key = (problem_type, feature_fields, context_fields)
+
+    if not hasattr(_LOCAL, "evaluators"):
+        _LOCAL.evaluators = LRUCache(maxsize=256)
+
+    evaluator = _LOCAL.evaluators.get(key)
+
+    if evaluator is None:
+        evaluator = _build_evaluator(feature_fields, context_fields)
+        _LOCAL.evaluators[key] = evaluator
+
+    return evaluator
+
+
+def _get_metrics() -> list:
+    if not hasattr(_LOCAL, "metrics"):
+        _LOCAL.metrics = [metric_class() for metric_class in _METRIC_CLASSES]
+
+    return _LOCAL.metrics
+
+
 # ---------------------------------------------------------------------------
 # Utility functions
 # ---------------------------------------------------------------------------
@@ -55,42 +120,90 @@ def _calc_mean(records) -> dict[str, float]:
     }
 
 
+def _extract_aggregates(result_dict) -> Optional[dict[str, float]]:
+    # Aggregated results carry one entry per metric; record-level results are
+    # a flat list of per-row entries that still need averaging.
+    if not isinstance(result_dict, dict) or "metrics_result" not in result_dict:
+        return None
+
+    aggregates = {}
+
+    for metric in result_dict["metrics_result"]:
+        name = metric.get("name")
+        value = metric.get("value")
+
+        if value is None:
+            value = metric.get("mean")
+
+        if name is None or value is None:
+            continue
+
+        aggregates[name] = value
+
+    return aggregates
+
+
 # ---------------------------------------------------------------------------
 # Evaluator entry point
 # ---------------------------------------------------------------------------
+def _evaluate(evaluator, data, metrics):
+    # The evaluator looks up the current event loop from the calling thread and
+    # patches it with nest_asyncio, which only supports stock asyncio loops.
+    # Create one explicitly so a process-wide uvloop policy is never picked up.
+    loop = asyncio.SelectorEventLoop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        return evaluator.evaluate(data=data, metrics=metrics)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
 def run_evaluator(data, asset_properties) -> dict[str, float]:
     if data.empty:
         logger.info("Input data is empty; skipping evaluation.")
         return {}
 
-    metrics = [
-        AnswerRelevanceMetric(),
-        TextReadingEaseMetric(),
-        SocialBiasMetric(),
-        JailbreakMetric(),
-        TextGradeLevelMetric(),
-    ]
-
-    config = GenAIConfiguration(
-        input_fields=asset_properties.get("feature_fields", []),
-        context_fields=asset_properties.get("context_fields", [])
-        if asset_properties.get("problem_type") == "retrieval_augmented_generation"
-        else [],
-        output_fields=["generated_text"],
-        reference_fields=[],
-    )
+    evaluator = _get_evaluator(asset_properties)
 
     logger.info("Starting metrics evaluation.")
 
-    result = MetricsEvaluator(
-        api_client=GovAPIClient(credentials=Credentials(api_key=API_KEY)),
-        configuration=config,
-    ).evaluate(data=data, metrics=metrics)
-
+    result = _evaluate(evaluator, data, _get_metrics())
     result_dict = result.to_dict()
 
     if not result_dict:
         logger.warning("Evaluator returned no metric results.")
         return {}
 
+    aggregates = _extract_aggregates(result_dict)
+
+    if aggregates is not None:
+        return aggregates
+
+    if not isinstance(result_dict, list):
+        logger.error("Unexpected evaluator result type %s.", type(result_dict).__name__)
+        raise RuntimeError("Unexpected evaluator result structure")
+
     return _calc_mean(result_dict)
+
+
+def warmup(barrier=None) -> None:
+    # Hold this thread until every eval thread has picked up a warm-up task,
+    # so each thread loads its own metric models.
+    if barrier is not None:
+        barrier.wait()
+
+    data = pd.DataFrame(
+        {
+            "question": ["What is the capital of France?"],
+            "generated_text": ["Paris is the capital of France."],
+        }
+    )
+
+    # Use a throwaway evaluator so the dummy configuration is never cached.
+    evaluator = _build_evaluator(("question",), ())
+
+    logger.info("Warming up metric models.")
+    _evaluate(evaluator, data, _get_metrics())
+    logger.info("Metric models warmed up.")